@@ -1,8 +1,11 @@
 """Energy Data - Ember electricity generation, capacity, emissions and prices."""
+import logging
+
 from subsets_utils import load_nodes, validate_environment
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     validate_environment()
     workflow = load_nodes()
     workflow.run()
@@ -4,7 +4,15 @@ Sources:
 - Ember: Global electricity generation, capacity, and prices
 """
 
-from subsets_utils import get, save_raw_json
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from subsets_utils import (
+    delete_raw_file, get_client, load_state, save_state, raw_asset_exists, raw_writer,
+)
+
+log = logging.getLogger(__name__)
 
 
 EMBER_SOURCES = {
@@ -18,20 +26,79 @@ EMBER_SOURCES = {
 }
 
 
+def _fetch_source(name: str, url: str, cached: dict) -> dict | None:
+    """Stream one Ember CSV into its own gzip-compressed raw file.
+
+    Sends a conditional GET using the validators from the previous run —
+    GCS returns 304 with an empty body when the file is unchanged, so
+    unchanged sources cost one round trip and zero bytes. Response bytes
+    are piped straight from the socket into the compressed writer, so
+    memory stays bounded at the chunk size regardless of how large the
+    CSV is.
+
+    Returns the new validators on a 200, or None on a 304 (raw file kept).
+    """
+    headers = {}
+    if raw_asset_exists(name, "csv.gz"):
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with get_client().stream("GET", url, timeout=300.0, headers=headers) as response:
+        if response.status_code == 304:
+            log.info(f"  {name}: unchanged upstream (304)")
+            return None
+        response.raise_for_status()
+        total = 0
+        try:
+            with raw_writer(name, "csv.gz", compression="gzip") as f:
+                for chunk in response.iter_bytes(1 << 20):
+                    f.write(chunk)
+                    total += len(chunk)
+        except BaseException:
+            # The writer truncated the previous good file, so a failed
+            # download must not leave a partial csv.gz behind: the state
+            # still holds the old validators, and the next run would get a
+            # 304 and keep the corrupt file forever. Deleting it makes the
+            # next run skip the conditional headers and re-download in full.
+            delete_raw_file(name, "csv.gz")
+            raise
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+    log.info(f"  Downloaded {name}: {total:,} bytes")
+    return {k: v for k, v in validators.items() if v}
+
+
 def run():
     """Fetch all Ember electricity data sources."""
-    print("Ingesting Ember electricity data...")
-    all_data = {}
+    log.info("Ingesting Ember electricity data...")
+    state = load_state("ember_data")
 
-    for name, url in EMBER_SOURCES.items():
-        print(f"  Fetching {name}...")
-        response = get(url, timeout=300.0)
-        response.raise_for_status()
-        all_data[name] = response.text
-        print(f"    Downloaded {len(response.text)} bytes")
+    # All sources live on the same GCS origin, so fetching them concurrently
+    # over the shared connection pool overlaps the downloads while reusing
+    # one TCP/TLS setup per connection. Each fetch runs in a copy of the
+    # current context so the orchestrator's task-ID ContextVar reaches the
+    # workers and raw_writer lineage is recorded.
+    with ThreadPoolExecutor(max_workers=len(EMBER_SOURCES)) as executor:
+        futures = {name: executor.submit(contextvars.copy_context().run,
+                                         _fetch_source, name, url, state.get(name, {}))
+                   for name, url in EMBER_SOURCES.items()}
+        updated = False
+        for name, future in futures.items():
+            validators = future.result()
+            if validators is not None:
+                state[name] = validators
+                updated = True
+
+    # One state write per run: validators only matter for the *next* run,
+    # so there is no point rewriting the file after every source.
+    if updated:
+        save_state("ember_data", state)
 
-    save_raw_json(all_data, "ember_data", compress=True)
-    print("\nIngestion complete")
+    log.info("Ingestion complete")
 
 
 NODES = {
@@ -40,4 +107,5 @@ NODES = {
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     run()
@@ -6,10 +6,221 @@ Transforms:
 - Ember European prices (daily, monthly)
 """
 
+import contextvars
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pyarrow as pa
 import pyarrow.csv as csv
 import pyarrow.compute as pc
-from subsets_utils import load_raw_json, merge, publish, validate
+from subsets_utils import (
+    load_raw_file, load_state, save_state, merge, overwrite, publish, table_schema,
+    validate,
+)
+
+log = logging.getLogger(__name__)
+
+# Arrow's CPU and I/O pools are process-global and shared by every
+# read_csv/compute call. Size them once here so the three concurrent
+# transform threads draw from one bounded pool instead of stacking
+# per-reader defaults on top of our own thread fan-out.
+pa.set_cpu_count(os.cpu_count() or 4)
+pa.set_io_thread_count(max(2, (os.cpu_count() or 4) // 2))
+
+
+# Numeric and date columns are declared to the parser up front, so the
+# reader emits the final types directly (and fails fast on bad data)
+# instead of the transforms casting after the fact. Keys for columns a
+# given CSV doesn't have are ignored.
+ELECTRICITY_COLUMN_TYPES = {
+    "Year": pa.int32(),
+    "Date": pa.date32(),
+    "Value": pa.float64(),
+    "YoY absolute change": pa.float64(),
+    "YoY % change": pa.float64(),
+}
+
+PRICES_COLUMN_TYPES = {
+    "Date": pa.date32(),
+    "Price (EUR/MWhe)": pa.float64(),
+}
+
+# Source columns each transform actually consumes (the date column is
+# per-dataset). Restricting the parse to these skips tokenization and
+# conversion work for everything else in the CSV.
+GLOBAL_SOURCE_COLUMNS = [
+    "Area", "ISO 3 code", "Area type", "Continent", "Category",
+    "Subcategory", "Variable", "Unit", "Value",
+    "YoY absolute change", "YoY % change",
+]
+
+GLOBAL_OUTPUT_COLUMNS = [
+    "country_name", "country_code", "area_type", "continent", "category",
+    "subcategory", "variable", "unit", "value",
+    "yoy_change", "yoy_change_pct",
+]
+
+INDIA_SOURCE_COLUMNS = [
+    "Country", "Country code", "State", "State code", "State type",
+    "Category", "Subcategory", "Variable", "Unit", "Value",
+    "YoY absolute change", "YoY % change",
+]
+
+INDIA_OUTPUT_COLUMNS = [
+    "country_name", "country_code", "state", "state_code", "state_type",
+    "category", "subcategory", "variable", "unit", "value",
+    "yoy_change", "yoy_change_pct",
+]
+
+PRICES_SOURCE_COLUMNS = ["Country", "ISO3 Code", "Price (EUR/MWhe)"]
+
+PRICES_OUTPUT_COLUMNS = ["country_name", "country_code", "price_eur_mwh"]
+
+# Output columns that repeat a handful of distinct values across every row.
+# Dictionary-encoding them shrinks the in-memory table and the bytes going
+# into the Delta write.
+GLOBAL_DICT_COLUMNS = [
+    "country_name", "country_code", "area_type", "continent",
+    "category", "subcategory", "variable", "unit",
+]
+
+INDIA_DICT_COLUMNS = [
+    "country_name", "country_code", "state", "state_code", "state_type",
+    "category", "subcategory", "variable", "unit",
+]
+
+PRICES_DICT_COLUMNS = ["country_name", "country_code"]
+
+# 8 MB blocks give the multi-threaded parser enough work per chunk on the
+# larger CSVs without ballooning memory on the small ones.
+READ_OPTIONS = csv.ReadOptions(use_threads=True, block_size=8 << 20)
+
+
+def _date_strings(date_values, month_only: bool):
+    """Render date32 values as ISO strings without per-element strftime.
+
+    The date32 -> string cast is plain integer arithmetic in Arrow C++ and
+    emits YYYY-MM-DD; truncating the day suffix yields YYYY-MM. Both steps
+    are far cheaper than strftime with its locale/timezone handling.
+    """
+    iso = pc.cast(date_values, pa.string())
+    return pc.utf8_slice_codeunits(iso, 0, 7) if month_only else iso
+
+
+def _load_source(dataset_id: str, raw_key: str) -> bytes | None:
+    """Load a dataset's compressed CSV bytes, or None if unchanged.
+
+    The raw file is only rewritten by ingest when the upstream copy
+    actually changed, so a matching content hash in the dataset's state
+    means the published table is already up to date and the whole
+    transform + merge + publish pass can be skipped.
+    """
+    data = load_raw_file(raw_key, "csv.gz", binary=True)
+    input_hash = hashlib.md5(data).hexdigest()[:16]
+    if load_state(dataset_id).get("input_hash") == input_hash:
+        log.info(f"  {dataset_id}: input unchanged, skipping")
+        return None
+    return data
+
+
+def _save_input_hash(dataset_id: str, data: bytes) -> None:
+    """Record the input hash after a successful merge + publish."""
+    save_state(dataset_id, {"input_hash": hashlib.md5(data).hexdigest()[:16]})
+
+
+def _publish_metadata(dataset_id: str, cfg: dict) -> None:
+    """Publish a dataset's registry metadata to its Delta table."""
+    publish(dataset_id, {
+        "id": dataset_id,
+        "title": cfg["title"],
+        "description": cfg["description"],
+        "license": "CC-BY-4.0",
+        "column_descriptions": cfg["column_descriptions"],
+    })
+
+
+def _dictionary_encode(table: pa.Table, columns: list[str]) -> pa.Table:
+    """Dictionary-encode the given low-cardinality string columns in place."""
+    for name in columns:
+        idx = table.schema.get_field_index(name)
+        table = table.set_column(idx, name, pc.dictionary_encode(table.column(name)))
+    return table
+
+
+def _parse_csv(data: bytes, convert_options: csv.ConvertOptions) -> pa.Table:
+    """Parse a gzip-compressed CSV into Arrow.
+
+    The stored bytes are wrapped in a BufferReader and decompressed by
+    Arrow's native gzip stream, so parsing never round-trips through
+    Python-level file reads or string copies. Only the columns named in
+    convert_options are converted; the rest of the CSV is skipped at
+    parse time.
+    """
+    return csv.read_csv(
+        pa.CompressedInputStream(pa.BufferReader(data), "gzip"),
+        read_options=READ_OPTIONS,
+        convert_options=convert_options,
+    )
+
+
+def _transform_dataset(dataset_id: str, cfg: dict) -> None:
+    """Transform one dataset: parse, project, validate, merge, publish.
+
+    All seven datasets follow the same shape; cfg["family"] supplies the
+    column lists, expected types, validator, merge key and column
+    descriptions, and an optional postprocess hook.
+    """
+    family = cfg["family"]
+    data = _load_source(dataset_id, cfg["raw_key"])
+    if data is None:
+        # The data is up to date, but registry edits to titles or column
+        # descriptions still need to reach the published table. publish()
+        # is idempotent and no-ops when the stored metadata matches.
+        _publish_metadata(dataset_id, cfg)
+        return
+    table = _parse_csv(data, cfg["convert_options"])
+
+    # Year passes through as int32; Date is rendered as YYYY-MM / YYYY-MM-DD
+    date_values = table.column(cfg["date_source"])
+    if cfg["date_source"] == "Date":
+        date_values = _date_strings(date_values, month_only=cfg["date_col"] == "month")
+
+    # Pass-through columns keep their original buffers; only the date
+    # column is prepended.
+    output_table = (table.select(family["source_columns"])
+                    .rename_columns(family["output_columns"])
+                    .add_column(0, cfg["date_col"], date_values))
+
+    if postprocess := family.get("postprocess"):
+        output_table = postprocess(output_table, cfg["date_col"])
+
+    output_table = _dictionary_encode(output_table, family["dict_columns"])
+
+    log.info(f"  {dataset_id}: {output_table.num_rows:,} rows")
+
+    family["test"](output_table, cfg["date_col"])
+
+    # delta-rs merge coerces the source to the target's types, so tables
+    # created before the typed parse (string year) would silently stay on
+    # their old schema. When the published date column's type differs,
+    # rewrite the table once — the Ember CSVs are full releases, so an
+    # overwrite loses nothing. Only the date column is compared: the
+    # dictionary-encoded columns read back as plain strings from Delta and
+    # would always mismatch.
+    existing = table_schema(dataset_id)
+    date_type = output_table.schema.field(cfg["date_col"]).type
+    if (existing is not None and cfg["date_col"] in existing.names
+            and existing.field(cfg["date_col"]).type != date_type):
+        log.info(f"  {dataset_id}: migrating {cfg['date_col']} to {date_type}")
+        overwrite(output_table, dataset_id)
+    else:
+        merge(output_table, dataset_id, key=[cfg["date_col"]] + family["key"])
+
+    _publish_metadata(dataset_id, cfg)
+
+    _save_input_hash(dataset_id, data)
 
 
 # =============================================================================
@@ -20,7 +231,7 @@ def test_ember(table: pa.Table, date_col: str):
     """Validate Ember electricity datasets."""
     validate(table, {
         "columns": {
-            date_col: "string",
+            date_col: "int32" if date_col == "year" else "string",
             "country_name": "string",
             "country_code": "string",
             "category": "string",
@@ -37,7 +248,7 @@ def test_india(table: pa.Table, date_col: str):
     """Validate India electricity datasets."""
     validate(table, {
         "columns": {
-            date_col: "string",
+            date_col: "int32" if date_col == "year" else "string",
             "state": "string",
             "category": "string",
             "variable": "string",
@@ -106,55 +317,16 @@ GLOBAL_COLUMN_DESCRIPTIONS = {
 }
 
 
-def transform_global_electricity():
-    """Transform Ember global electricity datasets."""
-    print("\n--- Ember Global Electricity ---")
-    raw_data = load_raw_json("ember_data")
-
-    for dataset_id, cfg in GLOBAL_DATASETS.items():
-        csv_text = raw_data[cfg["raw_key"]]
-        table = csv.read_csv(pa.py_buffer(csv_text.encode()))
-
-        # Build output columns
-        date_values = table.column(cfg["date_source"])
-        if cfg["date_source"] == "Year":
-            date_values = pc.cast(date_values, pa.string())
-        elif cfg["date_source"] == "Date":
-            date_values = pc.strftime(date_values, format="%Y-%m")
-
-        columns = {
-            cfg["date_col"]: date_values,
-            "country_name": table.column("Area"),
-            "country_code": table.column("ISO 3 code"),
-            "area_type": table.column("Area type"),
-            "continent": table.column("Continent"),
-            "category": table.column("Category"),
-            "subcategory": table.column("Subcategory"),
-            "variable": table.column("Variable"),
-            "unit": table.column("Unit"),
-            "value": pc.cast(table.column("Value"), pa.float64()),
-            "yoy_change": pc.cast(table.column("YoY absolute change"), pa.float64()),
-            "yoy_change_pct": pc.cast(table.column("YoY % change"), pa.float64()),
-        }
-
-        output_table = pa.table(columns)
-
-        print(f"  {dataset_id}: {output_table.num_rows:,} rows")
-
-        test_ember(output_table, cfg["date_col"])
-
-        merge(output_table, dataset_id, key=[cfg["date_col"], "country_name", "category", "subcategory", "variable", "unit"])
-
-        col_desc = {cfg["date_col"]: f"{cfg['date_col'].title()} of observation"}
-        col_desc.update({k: v for k, v in GLOBAL_COLUMN_DESCRIPTIONS.items() if k != cfg["date_col"]})
-
-        publish(dataset_id, {
-            "id": dataset_id,
-            "title": cfg["title"],
-            "description": cfg["description"],
-            "license": "CC-BY-4.0",
-            "column_descriptions": col_desc,
-        })
+GLOBAL_FAMILY = {
+    "column_types": ELECTRICITY_COLUMN_TYPES,
+    "source_columns": GLOBAL_SOURCE_COLUMNS,
+    "output_columns": GLOBAL_OUTPUT_COLUMNS,
+    "dict_columns": GLOBAL_DICT_COLUMNS,
+    "descriptions": GLOBAL_COLUMN_DESCRIPTIONS,
+    "test": test_ember,
+    "key": ["country_name", "category", "subcategory", "variable", "unit"],
+}
+
 
 # =============================================================================
 # India Electricity Transform
@@ -193,55 +365,16 @@ INDIA_COLUMN_DESCRIPTIONS = {
 }
 
 
-def transform_india_electricity():
-    """Transform Ember India electricity datasets."""
-    print("\n--- Ember India Electricity ---")
-    raw_data = load_raw_json("ember_data")
-
-    for dataset_id, cfg in INDIA_DATASETS.items():
-        csv_text = raw_data[cfg["raw_key"]]
-        table = csv.read_csv(pa.py_buffer(csv_text.encode()))
-
-        date_values = table.column(cfg["date_source"])
-        if cfg["date_source"] == "Year":
-            date_values = pc.cast(date_values, pa.string())
-        elif cfg["date_source"] == "Date":
-            date_values = pc.strftime(date_values, format="%Y-%m")
-
-        columns = {
-            cfg["date_col"]: date_values,
-            "country_name": table.column("Country"),
-            "country_code": table.column("Country code"),
-            "state": table.column("State"),
-            "state_code": table.column("State code"),
-            "state_type": table.column("State type"),
-            "category": table.column("Category"),
-            "subcategory": table.column("Subcategory"),
-            "variable": table.column("Variable"),
-            "unit": table.column("Unit"),
-            "value": pc.cast(table.column("Value"), pa.float64()),
-            "yoy_change": pc.cast(table.column("YoY absolute change"), pa.float64()),
-            "yoy_change_pct": pc.cast(table.column("YoY % change"), pa.float64()),
-        }
-
-        output_table = pa.table(columns)
-
-        print(f"  {dataset_id}: {output_table.num_rows:,} rows")
-
-        test_india(output_table, cfg["date_col"])
-
-        merge(output_table, dataset_id, key=[cfg["date_col"], "state_code", "category", "subcategory", "variable", "unit"])
-
-        col_desc = {cfg["date_col"]: f"{cfg['date_col'].title()} of observation"}
-        col_desc.update({k: v for k, v in INDIA_COLUMN_DESCRIPTIONS.items() if k != cfg["date_col"]})
-
-        publish(dataset_id, {
-            "id": dataset_id,
-            "title": cfg["title"],
-            "description": cfg["description"],
-            "license": "CC-BY-4.0",
-            "column_descriptions": col_desc,
-        })
+INDIA_FAMILY = {
+    "column_types": ELECTRICITY_COLUMN_TYPES,
+    "source_columns": INDIA_SOURCE_COLUMNS,
+    "output_columns": INDIA_OUTPUT_COLUMNS,
+    "dict_columns": INDIA_DICT_COLUMNS,
+    "descriptions": INDIA_COLUMN_DESCRIPTIONS,
+    "test": test_india,
+    "key": ["state_code", "category", "subcategory", "variable", "unit"],
+}
+
 
 # =============================================================================
 # European Prices Transform
@@ -251,12 +384,14 @@ PRICES_DATASETS = {
     "ember_electricity_prices_daily": {
         "raw_key": "ember_electricity_prices_daily",
         "date_col": "date",
+        "date_source": "Date",
         "title": "Ember European Electricity Prices (Daily)",
         "description": "Daily wholesale day-ahead electricity prices for European countries. Frequency is always daily. Currency is always EUR.",
     },
     "ember_electricity_prices_monthly": {
         "raw_key": "ember_electricity_prices_monthly",
         "date_col": "month",
+        "date_source": "Date",
         "title": "Ember European Electricity Prices (Monthly)",
         "description": "Monthly average wholesale day-ahead electricity prices for European countries. Frequency is always monthly. Currency is always EUR.",
     },
@@ -271,63 +406,74 @@ PRICES_COLUMN_DESCRIPTIONS = {
 }
 
 
-def transform_european_prices():
-    """Transform Ember European electricity price datasets."""
-    print("\n--- Ember European Prices ---")
-    raw_data = load_raw_json("ember_data")
-
-    for dataset_id, cfg in PRICES_DATASETS.items():
-        csv_text = raw_data[cfg["raw_key"]]
-        table = csv.read_csv(pa.py_buffer(csv_text.encode()))
-
-        date_values = table.column("Date")
-        if cfg["date_col"] == "month":
-            date_values = pc.strftime(date_values, format="%Y-%m")
-        else:
-            date_values = pc.strftime(date_values, format="%Y-%m-%d")
-
-        columns = {
-            cfg["date_col"]: date_values,
-            "country_name": table.column("Country"),
-            "country_code": table.column("ISO3 Code"),
-            "price_eur_mwh": pc.cast(table.column("Price (EUR/MWhe)"), pa.float64()),
-        }
-
-        output_table = pa.table(columns)
+def _average_duplicate_prices(table: pa.Table, date_col: str) -> pa.Table:
+    """Collapse multiple observations per (date, country) to their mean."""
+    return table.group_by([date_col, "country_name", "country_code"]).aggregate([
+        ("price_eur_mwh", "mean"),
+    ]).rename_columns([date_col, "country_name", "country_code", "price_eur_mwh"])
 
-        output_table = output_table.group_by([cfg["date_col"], "country_name", "country_code"]).aggregate([
-            ("price_eur_mwh", "mean"),
-        ]).rename_columns([cfg["date_col"], "country_name", "country_code", "price_eur_mwh"])
 
-        print(f"  {dataset_id}: {output_table.num_rows:,} rows")
-
-        test_prices(output_table, cfg["date_col"])
-
-        merge(output_table, dataset_id, key=[cfg["date_col"], "country_code"])
-
-        col_desc = {k: v for k, v in PRICES_COLUMN_DESCRIPTIONS.items() if k in output_table.column_names}
+PRICES_FAMILY = {
+    "column_types": PRICES_COLUMN_TYPES,
+    "source_columns": PRICES_SOURCE_COLUMNS,
+    "output_columns": PRICES_OUTPUT_COLUMNS,
+    "dict_columns": PRICES_DICT_COLUMNS,
+    "descriptions": PRICES_COLUMN_DESCRIPTIONS,
+    "test": test_prices,
+    "key": ["country_code"],
+    "postprocess": _average_duplicate_prices,
+}
 
-        publish(dataset_id, {
-            "id": dataset_id,
-            "title": cfg["title"],
-            "description": cfg["description"],
-            "license": "CC-BY-4.0",
-            "column_descriptions": col_desc,
-        })
 
 # =============================================================================
 # Main
 # =============================================================================
 
+def _column_descriptions(date_col: str, family: dict) -> dict:
+    """Column descriptions for one dataset, derived from its date column."""
+    date_desc = family["descriptions"].get(date_col, f"{date_col.title()} of observation")
+    col_desc = {date_col: date_desc}
+    col_desc.update({k: v for k, v in family["descriptions"].items()
+                     if k != date_col and k in family["output_columns"]})
+    return col_desc
+
+
+# Single registry of every dataset. The per-family dicts above only group
+# the shared column lists, validators and descriptions; everything below
+# iterates this one mapping. Column descriptions and CSV convert options
+# are fully determined by the config, so they are built once here at
+# import instead of per transform call.
+DATASETS = {}
+for _datasets, _family in ((GLOBAL_DATASETS, GLOBAL_FAMILY),
+                           (INDIA_DATASETS, INDIA_FAMILY),
+                           (PRICES_DATASETS, PRICES_FAMILY)):
+    for _dataset_id, _cfg in _datasets.items():
+        _cfg["family"] = _family
+        _cfg["column_descriptions"] = _column_descriptions(_cfg["date_col"], _family)
+        _cfg["convert_options"] = csv.ConvertOptions(
+            column_types=_family["column_types"],
+            include_columns=[_cfg["date_source"]] + _family["source_columns"],
+        )
+        DATASETS[_dataset_id] = _cfg
+
+
 def run():
     """Transform all energy datasets."""
-    print("Transforming energy datasets...")
+    log.info("Transforming energy datasets...")
 
-    transform_global_electricity()
-    transform_india_electricity()
-    transform_european_prices()
+    # The datasets share no state and spend most of their time in
+    # GIL-releasing Arrow C++ (CSV parse, compute kernels) or Delta I/O,
+    # so running them on threads overlaps CPU with network. Each task runs
+    # in a copy of the current context so the orchestrator's task-ID
+    # ContextVar reaches the workers and merge/publish lineage is recorded.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(contextvars.copy_context().run,
+                                   _transform_dataset, dataset_id, cfg)
+                   for dataset_id, cfg in DATASETS.items()]
+        for future in futures:
+            future.result()
 
-    print("\nAll transforms complete")
+    log.info("All transforms complete")
 
 
 from nodes.ingest import run as ingest_run
@@ -338,4 +484,5 @@ NODES = {
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     run()
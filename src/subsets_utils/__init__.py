@@ -7,7 +7,7 @@ from .io import (
     list_raw_files, delete_raw_file, data_hash, raw_parquet_hash, raw_asset_exists,
     raw_writer, raw_reader, raw_parquet_writer,
 )
-from .delta import merge, overwrite, append, validate_asset, WriteResult
+from .delta import merge, overwrite, append, validate_asset, table_schema, WriteResult
 from .orchestrator import DAG, load_nodes
 from . import duckdb
 from .config import validate_environment, get_data_dir, is_cloud, get_fs
@@ -20,7 +20,7 @@ __all__ = [
     # HTTP
     'get', 'post', 'put', 'delete', 'get_client', 'configure_http',
     # Delta writes
-    'merge', 'overwrite', 'append', 'validate_asset', 'WriteResult',
+    'merge', 'overwrite', 'append', 'validate_asset', 'table_schema', 'WriteResult',
     # Publishing
     'publish',
     # State & raw I/O
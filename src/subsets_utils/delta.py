@@ -170,6 +170,22 @@ def validate_asset(
     return report
 
 
+def table_schema(name: str) -> pa.Schema | None:
+    """Arrow schema of an existing Delta table, or None if it doesn't exist.
+
+    Reads only the Delta log — no data scan. Use to detect schema drift
+    between a transform's output and an already-published table.
+    """
+    try:
+        dt = DeltaTable(_get_uri(name), storage_options=_get_opts())
+    except Exception as e:
+        if _is_table_not_found(e):
+            return None
+        raise
+    schema = dt.schema()
+    return schema.to_pyarrow() if hasattr(schema, "to_pyarrow") else schema.to_arrow()
+
+
 def _get_uri(name: str) -> str:
     """Get Delta table URI based on environment."""
     if is_cloud():
@@ -6,7 +6,11 @@ from . import debug
 _client = None
 _client_config = {
     'timeout': int(os.environ.get('HTTP_TIMEOUT', '30')),
-    'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')}
+    'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')},
+    # One process-wide pool shared by every ingest module. Keep-alive
+    # connections persist across sequential run() calls, so repeated hits
+    # to the same host skip the TCP/TLS handshake.
+    'limits': httpx.Limits(max_connections=32, max_keepalive_connections=16),
 }
 
 
@@ -17,6 +21,7 @@ def _get_or_create_client() -> httpx.Client:
         _client = httpx.Client(
             timeout=_client_config['timeout'],
             headers=_client_config['headers'],
+            limits=_client_config['limits'],
             follow_redirects=True
         )
 
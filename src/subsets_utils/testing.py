@@ -27,8 +27,29 @@ Usage in asset test.py:
         assert_positive(table, "value")
 """
 
-import re
 import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def _non_null_strings(table: pa.Table, column: str) -> pa.ChunkedArray:
+    """Non-null values of a column as strings, for the utf8_* kernels."""
+    col = pc.drop_null(table.column(column))
+    if pa.types.is_string(col.type) or pa.types.is_large_string(col.type):
+        return col
+    return pc.cast(col, pa.string())
+
+
+def _sample(col, mask, n: int = 5) -> list:
+    """First n values of col selected by mask, for error messages."""
+    return col.filter(mask).slice(0, n).to_pylist()
+
+
+def _assert_full_match(table: pa.Table, column: str, pattern: str, what: str) -> None:
+    """Assert all non-null values fully match an anchored regex, in one kernel pass."""
+    col = _non_null_strings(table, column)
+    mask = pc.invert(pc.match_substring_regex(col, pattern))
+    if pc.any(mask).as_py():
+        raise AssertionError(f"Column '{column}' has invalid {what} values: {_sample(col, mask)}...")
 
 
 # =============================================================================
@@ -37,56 +58,41 @@ import pyarrow as pa
 
 def assert_valid_year(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid years (YYYY format, 4 digits)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}$")
-    invalid = [v for v in values if not pattern.match(str(v))]
-    assert not invalid, f"Column '{column}' has invalid year values: {invalid[:5]}..."
+    _assert_full_match(table, column, r"^\d{4}$", "year")
 
 
 def assert_valid_quarter(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid quarters (YYYY-QN format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-Q[1-4]$")
-    invalid = [v for v in values if not pattern.match(str(v))]
-    assert not invalid, f"Column '{column}' has invalid quarter values: {invalid[:5]}..."
+    _assert_full_match(table, column, r"^\d{4}-Q[1-4]$", "quarter")
 
 
 def assert_valid_month(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid months (YYYY-MM format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
-    invalid = [v for v in values if not pattern.match(str(v))]
-    assert not invalid, f"Column '{column}' has invalid month values: {invalid[:5]}..."
+    _assert_full_match(table, column, r"^\d{4}-(0[1-9]|1[0-2])$", "month")
 
 
 def assert_valid_week(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid weeks (YYYY-WNN format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-W(0[1-9]|[1-4]\d|5[0-3])$")
-    invalid = [v for v in values if not pattern.match(str(v))]
-    assert not invalid, f"Column '{column}' has invalid week values: {invalid[:5]}..."
+    _assert_full_match(table, column, r"^\d{4}-W(0[1-9]|[1-4]\d|5[0-3])$", "week")
 
 
 def assert_valid_date(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid dates (YYYY-MM-DD format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$")
-    invalid = [v for v in values if not pattern.match(str(v))]
-    assert not invalid, f"Column '{column}' has invalid date values: {invalid[:5]}..."
+    _assert_full_match(table, column, r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$", "date")
 
 
 def assert_valid_date_any(table: pa.Table, column: str) -> None:
     """Assert all non-null values match one of: YYYY, YYYY-QN, YYYY-MM, YYYY-WNN, YYYY-MM-DD."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    patterns = [
-        re.compile(r"^\d{4}$"),  # Year
-        re.compile(r"^\d{4}-Q[1-4]$"),  # Quarter
-        re.compile(r"^\d{4}-(0[1-9]|1[0-2])$"),  # Month
-        re.compile(r"^\d{4}-W(0[1-9]|[1-4]\d|5[0-3])$"),  # Week
-        re.compile(r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$"),  # Date
-    ]
-    invalid = [v for v in values if not any(p.match(str(v)) for p in patterns)]
-    assert not invalid, f"Column '{column}' has invalid date values: {invalid[:5]}..."
+    # Single alternation so the column is scanned once, not once per format.
+    _assert_full_match(
+        table, column,
+        r"^(\d{4}"
+        r"|\d{4}-Q[1-4]"
+        r"|\d{4}-(0[1-9]|1[0-2])"
+        r"|\d{4}-W(0[1-9]|[1-4]\d|5[0-3])"
+        r"|\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01]))$",
+        "date",
+    )
 
 
 # =============================================================================
@@ -95,38 +101,45 @@ def assert_valid_date_any(table: pa.Table, column: str) -> None:
 
 def assert_max_length(table: pa.Table, column: str, max_len: int) -> None:
     """Assert all non-null string values have length <= max_len."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    invalid = [v for v in values if len(str(v)) > max_len]
-    assert not invalid, f"Column '{column}' has values exceeding {max_len} chars: {invalid[:5]}..."
+    col = _non_null_strings(table, column)
+    mask = pc.greater(pc.utf8_length(col), max_len)
+    if pc.any(mask).as_py():
+        raise AssertionError(f"Column '{column}' has values exceeding {max_len} chars: {_sample(col, mask)}...")
 
 
 def assert_min_length(table: pa.Table, column: str, min_len: int) -> None:
     """Assert all non-null string values have length >= min_len."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    invalid = [v for v in values if len(str(v)) < min_len]
-    assert not invalid, f"Column '{column}' has values shorter than {min_len} chars: {invalid[:5]}..."
+    col = _non_null_strings(table, column)
+    mask = pc.less(pc.utf8_length(col), min_len)
+    if pc.any(mask).as_py():
+        raise AssertionError(f"Column '{column}' has values shorter than {min_len} chars: {_sample(col, mask)}...")
 
 
 def assert_length(table: pa.Table, column: str, exact_len: int) -> None:
     """Assert all non-null string values have exactly the specified length."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    invalid = [v for v in values if len(str(v)) != exact_len]
-    assert not invalid, f"Column '{column}' has values not exactly {exact_len} chars: {invalid[:5]}..."
+    col = _non_null_strings(table, column)
+    mask = pc.not_equal(pc.utf8_length(col), exact_len)
+    if pc.any(mask).as_py():
+        raise AssertionError(f"Column '{column}' has values not exactly {exact_len} chars: {_sample(col, mask)}...")
 
 
 def assert_matches_pattern(table: pa.Table, column: str, pattern: str, description: str = None) -> None:
-    """Assert all non-null values match the regex pattern."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    regex = re.compile(pattern)
-    invalid = [v for v in values if not regex.match(str(v))]
-    desc = description or f"pattern '{pattern}'"
-    assert not invalid, f"Column '{column}' has values not matching {desc}: {invalid[:5]}..."
+    """Assert all non-null values match the regex pattern (anchored at the start)."""
+    col = _non_null_strings(table, column)
+    # match_substring_regex matches anywhere in the value; anchor the
+    # caller's pattern to keep re.match semantics for unanchored patterns.
+    mask = pc.invert(pc.match_substring_regex(col, "^(?:" + pattern + ")"))
+    if pc.any(mask).as_py():
+        desc = description or f"pattern '{pattern}'"
+        raise AssertionError(f"Column '{column}' has values not matching {desc}: {_sample(col, mask)}...")
 
 
 def assert_in_set(table: pa.Table, column: str, valid_values: set) -> None:
     """Assert all non-null values are in the set of valid values."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    invalid = [v for v in values if v not in valid_values]
+    # Distinct values come from a C++ hash pass; only the handful of
+    # distinct results cross into Python for the membership check.
+    distinct = pc.unique(pc.drop_null(table.column(column))).to_pylist()
+    invalid = [v for v in distinct if v not in valid_values]
     assert not invalid, f"Column '{column}' has unexpected values: {invalid[:5]}..."
 
 
@@ -136,26 +149,29 @@ def assert_in_set(table: pa.Table, column: str, valid_values: set) -> None:
 
 def assert_positive(table: pa.Table, column: str, allow_zero: bool = True) -> None:
     """Assert all non-null numeric values are positive (or zero if allow_zero=True)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
+    col = pc.drop_null(table.column(column))
     if allow_zero:
-        invalid = [v for v in values if v < 0]
-        assert not invalid, f"Column '{column}' has negative values: {invalid[:5]}..."
+        mask = pc.less(col, 0)
+        if pc.any(mask).as_py():
+            raise AssertionError(f"Column '{column}' has negative values: {_sample(col, mask)}...")
     else:
-        invalid = [v for v in values if v <= 0]
-        assert not invalid, f"Column '{column}' has non-positive values: {invalid[:5]}..."
+        mask = pc.less_equal(col, 0)
+        if pc.any(mask).as_py():
+            raise AssertionError(f"Column '{column}' has non-positive values: {_sample(col, mask)}...")
 
 
 def assert_in_range(table: pa.Table, column: str, min_val: float = None, max_val: float = None) -> None:
     """Assert all non-null numeric values are within the specified range."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    invalid = []
-    for v in values:
-        if min_val is not None and v < min_val:
-            invalid.append(v)
-        elif max_val is not None and v > max_val:
-            invalid.append(v)
-    range_desc = f"[{min_val}, {max_val}]"
-    assert not invalid, f"Column '{column}' has values outside range {range_desc}: {invalid[:5]}..."
+    col = pc.drop_null(table.column(column))
+    mask = None
+    if min_val is not None:
+        mask = pc.less(col, min_val)
+    if max_val is not None:
+        above = pc.greater(col, max_val)
+        mask = above if mask is None else pc.or_(mask, above)
+    if mask is not None and pc.any(mask).as_py():
+        range_desc = f"[{min_val}, {max_val}]"
+        raise AssertionError(f"Column '{column}' has values outside range {range_desc}: {_sample(col, mask)}...")
 
 
 def assert_percentage(table: pa.Table, column: str) -> None:
@@ -212,12 +228,11 @@ def validate(table: pa.Table, schema: dict) -> None:
             unique = [unique]
 
         if len(unique) == 1:
-            values = table.column(unique[0]).to_pylist()
-            duplicates = len(values) - len(set(values))
+            duplicates = len(table) - len(pc.unique(table.column(unique[0])))
             assert duplicates == 0, f"Column '{unique[0]}' has {duplicates} duplicate values"
         else:
-            # Composite key - convert columns once, then zip
-            columns_as_lists = [table.column(col).to_pylist() for col in unique]
-            rows = list(zip(*columns_as_lists))
-            duplicates = len(rows) - len(set(rows))
+            # Composite key - one hash-aggregate pass over the key columns,
+            # instead of materializing every row as a Python tuple
+            distinct = table.select(unique).group_by(unique).aggregate([])
+            duplicates = len(table) - distinct.num_rows
             assert duplicates == 0, f"Columns {unique} have {duplicates} duplicate combinations"